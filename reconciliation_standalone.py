@@ -10,10 +10,15 @@ Author: Rahul Yatagiri
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Optional
 from enum import Enum
+import io
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -37,6 +42,19 @@ class Severity(Enum):
     LOW = "LOW"
 
 
+# Enum values as plain strings for the reconciliation hot paths
+BT_QTY = BreakType.QUANTITY_MISMATCH.value
+BT_PRICE = BreakType.PRICE_MISMATCH.value
+BT_MV = BreakType.MARKET_VALUE_MISMATCH.value
+BT_MISSING_SOURCE = BreakType.MISSING_IN_SOURCE.value
+BT_MISSING_TARGET = BreakType.MISSING_IN_TARGET.value
+
+SEV_CRITICAL = Severity.CRITICAL.value
+SEV_HIGH = Severity.HIGH.value
+SEV_MEDIUM = Severity.MEDIUM.value
+SEV_LOW = Severity.LOW.value
+
+
 # Tolerance configuration
 TOLERANCES = {
     'quantity_pct': 1.0,        # 1% tolerance for quantity
@@ -45,6 +63,30 @@ TOLERANCES = {
     'min_threshold': 100        # $100 de minimis
 }
 
+# Severity escalates one level for each dollar or percentage threshold a
+# break exceeds; the higher of the two levels wins
+SEVERITY_VARIANCE_THRESHOLDS = [10000, 50000, 100000]
+SEVERITY_PCT_THRESHOLDS = [2, 5, 10]
+SEVERITY_LEVELS = np.array([SEV_LOW, SEV_MEDIUM, SEV_HIGH, SEV_CRITICAL])
+
+# Categorical dtypes for the severity and break_type columns of the breaks frame
+SEVERITY_DTYPE = pd.CategoricalDtype([s.value for s in Severity])
+BREAK_TYPE_DTYPE = pd.CategoricalDtype([t.value for t in BreakType])
+
+# Total position count (both sides) at which reconciliation fans out one
+# worker process per account; smaller books are not worth the process startup
+PARALLEL_MIN_POSITIONS = 200000
+
+# Order reconcile_account emits break types in
+BREAK_TYPE_ORDER = [BT_MISSING_TARGET, BT_MISSING_SOURCE, BT_QTY, BT_PRICE, BT_MV]
+
+# Prices are compared in millionths of a dollar; whole cents would hide
+# breaks on sub-dollar instruments
+PRICE_SCALE = 1_000_000
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['symbol', 'account_id', 'currency', 'trade_date', 'settle_date']
+
 
 # =============================================================================
 # SAMPLE DATA GENERATOR
@@ -72,60 +114,69 @@ def generate_sample_data() -> tuple:
     accounts = ['HEDGE_FUND_01', 'HEDGE_FUND_02']
     trade_date = datetime.now() - timedelta(days=2)
     settle_date = datetime.now()
+    trade_date_str = trade_date.strftime('%Y-%m-%d')
+    settle_date_str = settle_date.strftime('%Y-%m-%d')
+    
+    # Generate Internal System positions, one array per column
+    n_stocks = len(stocks)
+    n_accounts = len(accounts)
+    n_positions = n_stocks * n_accounts
+    
+    # Draw every random input up front from a single generator
+    rng = np.random.default_rng(42)
+    quantities = rng.integers(1000, 15000, n_positions, dtype=np.int64)
+    qty_mask = rng.random(n_positions) < 0.20
+    qty_variance = rng.integers(-500, 500, n_positions, dtype=np.int64)
+    price_mask = rng.random(n_positions) < 0.15
+    price_shift = rng.uniform(-0.03, 0.03, n_positions)
+    
+    symbols = np.repeat([s['symbol'] for s in stocks], n_accounts)
+    price_cents = np.repeat(to_cents([s['price'] for s in stocks]), n_accounts)
+    account_ids = np.tile(accounts, n_stocks)
+    
+    # Prices and market values are computed in int64 cents and only
+    # converted to dollars for the position files
+    internal_df = pd.DataFrame({
+        'symbol': symbols,
+        'account_id': account_ids,
+        'quantity': quantities,
+        'price': price_cents / 100,
+        'market_value': quantities * price_cents / 100,
+        'currency': 'USD',
+        'trade_date': trade_date_str,
+        'settle_date': settle_date_str
+    })
+    
+    # Generate Prime Broker positions with intentional breaks:
+    # quantity breaks on ~20% of positions, price breaks on ~15%
+    pb_quantities = np.where(qty_mask, quantities + qty_variance, quantities)
+    pb_price_cents = np.where(price_mask, to_cents(price_cents * (1 + price_shift) / 100), price_cents)
     
-    np.random.seed(42)
-    
-    # Generate Internal System positions
-    internal_positions = []
-    for stock in stocks:
-        for account in accounts:
-            qty = np.random.randint(1000, 15000)
-            price = stock['price']
-            internal_positions.append({
-                'symbol': stock['symbol'],
-                'account_id': account,
-                'quantity': qty,
-                'price': price,
-                'market_value': round(qty * price, 2),
-                'currency': 'USD',
-                'trade_date': trade_date.strftime('%Y-%m-%d'),
-                'settle_date': settle_date.strftime('%Y-%m-%d')
-            })
-    
-    internal_df = pd.DataFrame(internal_positions)
-    
-    # Generate Prime Broker positions with intentional breaks
-    pb_positions = []
-    for i, row in internal_df.iterrows():
-        pb_row = row.copy()
-        
-        # Introduce quantity breaks (~20% of positions)
-        if np.random.random() < 0.20:
-            variance = np.random.randint(-500, 500)
-            pb_row['quantity'] = row['quantity'] + variance
-            pb_row['market_value'] = round(pb_row['quantity'] * pb_row['price'], 2)
-        
-        # Introduce price breaks (~15% of positions)
-        if np.random.random() < 0.15:
-            price_change = row['price'] * np.random.uniform(-0.03, 0.03)
-            pb_row['price'] = round(row['price'] + price_change, 2)
-            pb_row['market_value'] = round(pb_row['quantity'] * pb_row['price'], 2)
-        
-        pb_positions.append(pb_row.to_dict())
+    pb_df = internal_df.assign(
+        quantity=pb_quantities,
+        price=pb_price_cents / 100,
+        market_value=pb_quantities * pb_price_cents / 100
+    )
     
     # Add an extra position in PB (missing in internal)
-    pb_positions.append({
+    extra_positions = pd.DataFrame([{
         'symbol': 'NFLX',
         'account_id': 'HEDGE_FUND_01',
         'quantity': 2500,
         'price': 625.00,
         'market_value': 1562500.00,
         'currency': 'USD',
-        'trade_date': trade_date.strftime('%Y-%m-%d'),
-        'settle_date': settle_date.strftime('%Y-%m-%d')
-    })
+        'trade_date': trade_date_str,
+        'settle_date': settle_date_str
+    }])
+    
+    pb_df = pd.concat([pb_df, extra_positions], ignore_index=True)
     
-    pb_df = pd.DataFrame(pb_positions)
+    # Both frames share one set of categories per column so codes line up
+    for col in CATEGORICAL_COLUMNS:
+        dtype = pd.CategoricalDtype(pd.concat([internal_df[col], pb_df[col]]).unique())
+        internal_df[col] = internal_df[col].astype(dtype)
+        pb_df[col] = pb_df[col].astype(dtype)
     
     print(f"   ✓ Generated {len(internal_df)} internal positions")
     print(f"   ✓ Generated {len(pb_df)} prime broker positions")
@@ -139,141 +190,261 @@ def generate_sample_data() -> tuple:
 
 def calculate_severity(variance: float, variance_pct: float) -> Severity:
     """Determine break severity based on dollar amount and percentage"""
-    abs_var = abs(variance)
-    abs_pct = abs(variance_pct)
-    
-    if abs_var > 100000 or abs_pct > 10:
-        return Severity.CRITICAL
-    elif abs_var > 50000 or abs_pct > 5:
-        return Severity.HIGH
-    elif abs_var > 10000 or abs_pct > 2:
-        return Severity.MEDIUM
-    else:
-        return Severity.LOW
+    return Severity(str(classify_severity(variance, variance_pct)))
 
 
-def reconcile_positions(internal_df: pd.DataFrame, pb_df: pd.DataFrame) -> List[Dict]:
+def classify_severity(variance: np.ndarray, variance_pct: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_severity over arrays of variances, returns severity labels"""
+    # NaN exceeds no threshold, as with the > comparisons it replaces
+    abs_var = np.nan_to_num(np.abs(variance), nan=0.0)
+    abs_pct = np.nan_to_num(np.abs(variance_pct), nan=0.0)
+    level = np.maximum(np.searchsorted(SEVERITY_VARIANCE_THRESHOLDS, abs_var, side='left'),
+                       np.searchsorted(SEVERITY_PCT_THRESHOLDS, abs_pct, side='left'))
+    return SEVERITY_LEVELS[level]
+
+
+def to_cents(dollars) -> np.ndarray:
+    """Convert dollar amounts to int64 cents, rounding to the nearest cent; non-finite amounts become 0"""
+    dollars = np.asarray(dollars, dtype=np.float64)
+    return np.round(np.where(np.isfinite(dollars), dollars, 0) * 100).astype(np.int64)
+
+
+def to_price_units(dollars) -> np.ndarray:
+    """Convert prices to int64 multiples of 1 / PRICE_SCALE dollars; non-finite prices become 0"""
+    dollars = np.asarray(dollars, dtype=np.float64)
+    return np.round(np.where(np.isfinite(dollars), dollars, 0) * PRICE_SCALE).astype(np.int64)
+
+
+def encode_position_keys(internal_df: pd.DataFrame, pb_df: pd.DataFrame) -> tuple:
     """
-    Compare positions between Internal System and Prime Broker
-    Returns list of breaks/exceptions found
+    Map (symbol, account_id) pairs to integer keys shared by both frames
+    Symbols and accounts are factorized separately and combined, so matching
+    runs on int32 codes instead of concatenated strings
+    """
+    def factorize_column(col: str) -> tuple:
+        left, right = internal_df[col], pb_df[col]
+        # Categoricals with identical categories (in the same order) are
+        # already factorized; dtype equality ignores order for unordered ones
+        if (isinstance(left.dtype, pd.CategoricalDtype) and isinstance(right.dtype, pd.CategoricalDtype)
+                and left.cat.categories.equals(right.cat.categories)):
+            codes = np.concatenate([left.cat.codes.values, right.cat.codes.values])
+            return codes, len(left.cat.categories)
+        codes, uniques = pd.factorize(pd.concat([left, right], ignore_index=True))
+        return codes, len(uniques)
+    
+    n_internal = len(internal_df)
+    sym_codes, _ = factorize_column('symbol')
+    acct_codes, n_accounts = factorize_column('account_id')
+
+    # Missing values get code -1, which would collide with a real key once combined
+    for col, codes in (('symbol', sym_codes), ('account_id', acct_codes)):
+        for source, side in (('Internal', codes[:n_internal]), ('Prime Broker', codes[n_internal:])):
+            n_missing = np.count_nonzero(side < 0)
+            if n_missing:
+                raise ValueError(f"{n_missing} positions with missing {col} in {source} data")
+
+    keys = sym_codes.astype(np.int64) * max(n_accounts, 1) + acct_codes
+    if len(keys) == 0 or keys.max() <= np.iinfo(np.int32).max:
+        keys = keys.astype(np.int32)
+    
+    return keys[:n_internal], keys[n_internal:]
+
+
+def format_details(label: str, internal: np.ndarray, pb: np.ndarray, fmt: str) -> np.ndarray:
+    """Build '<label>: Internal=<x> vs PB=<y>' strings for a whole column of breaks"""
+    to_str = fmt.format
+    details = (label + ': Internal=' + pd.Series(internal).map(to_str).astype(str)
+               + ' vs PB=' + pd.Series(pb).map(to_str).astype(str))
+    return details.values
+
+
+def compare_matched(qty_int: np.ndarray, qty_pb: np.ndarray, price_int: np.ndarray,
+                    price_pb: np.ndarray, mv_int: np.ndarray, mv_pb: np.ndarray) -> tuple:
+    """
+    Compute variance and variance % (against Internal) for quantity, price and
+    market value of matched positions. Returns (qty_var, qty_var_pct, price_var,
+    price_var_pct, mv_var, mv_var_pct); variance % is 0 where Internal is 0
+    """
+    results = []
+    for int_vals, pb_vals in ((qty_int, qty_pb), (price_int, price_pb), (mv_int, mv_pb)):
+        var = int_vals - pb_vals
+        results.append(var)
+        results.append(np.where(int_vals != 0, var / int_vals * 100, 0))
+    return tuple(results)
+
+
+def reconcile_account(internal_df: pd.DataFrame, pb_df: pd.DataFrame,
+                      position_keys: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Find breaks between Internal System and Prime Broker positions
+    Works on any slice of the books; reconcile_positions runs it once per account
+    when reconciling in parallel, passing in position_keys encoded over the full
+    books. Returned breaks have no break_id yet and are indexed by position key
     """
     
-    print("\n🔍 Running reconciliation...")
+    # Sorted unique keys per side, with the row each key came from
+    if position_keys is None:
+        position_keys = encode_position_keys(internal_df, pb_df)
+    internal_keys, pb_keys = position_keys
+    u_int, int_rows = np.unique(internal_keys, return_index=True)
+    u_pb, pb_rows = np.unique(pb_keys, return_index=True)
     
-    breaks = []
+    # Matching is one-to-one; duplicate positions would otherwise be dropped silently
+    for source, keys, unique_keys in (('Internal', internal_keys, u_int), ('Prime Broker', pb_keys, u_pb)):
+        if len(unique_keys) != len(keys):
+            raise pd.errors.MergeError(
+                f"{len(keys) - len(unique_keys)} duplicate (symbol, account_id) positions in {source} data")
     
-    # Create position keys for matching
-    internal_df['pos_key'] = internal_df['symbol'] + '|' + internal_df['account_id']
-    pb_df['pos_key'] = pb_df['symbol'] + '|' + pb_df['account_id']
+    # Check for missing positions
+    int_only = ~np.isin(u_int, u_pb, assume_unique=True)
+    pb_only = ~np.isin(u_pb, u_int, assume_unique=True)
+    missing_in_pb = internal_df.iloc[int_rows[int_only]]
+    missing_in_internal = pb_df.iloc[pb_rows[pb_only]]
+    
+    # Line up the rows for positions held on both sides
+    matched_keys, int_idx, pb_idx = np.intersect1d(u_int, u_pb, assume_unique=True, return_indices=True)
+    int_matched = internal_df.iloc[int_rows[int_idx]]
+    pb_matched = pb_df.iloc[pb_rows[pb_idx]]
+    
+    break_frames = []
+    
+    int_mv = missing_in_pb['market_value']
+    break_frames.append(pd.DataFrame({
+        'break_type': BT_MISSING_TARGET,
+        'severity': classify_severity(int_mv.values, 100),
+        'symbol': missing_in_pb['symbol'].values,
+        'account_id': missing_in_pb['account_id'].values,
+        'internal_value': int_mv.values,
+        'pb_value': 0,
+        'variance': int_mv.values,
+        'variance_pct': 100.0,
+        'details': "Position exists in Internal but not in Prime Broker"
+    }, index=u_int[int_only]))
+    
+    pb_mv = missing_in_internal['market_value']
+    break_frames.append(pd.DataFrame({
+        'break_type': BT_MISSING_SOURCE,
+        'severity': classify_severity(pb_mv.values, 100),
+        'symbol': missing_in_internal['symbol'].values,
+        'account_id': missing_in_internal['account_id'].values,
+        'internal_value': 0,
+        'pb_value': pb_mv.values,
+        'variance': -pb_mv.values,
+        'variance_pct': -100.0,
+        'details': "Position exists in Prime Broker but not in Internal"
+    }, index=u_pb[pb_only]))
+    
+    # Compare matching positions; prices (in price units) and market values
+    # (in cents) are compared as int64 and converted back to dollars only
+    # for the break records. A missing price or market value on either side
+    # raises no break for that field, as NaN fails every tolerance check
+    qty_int = int_matched['quantity'].values
+    qty_pb = pb_matched['quantity'].values
+    priced = np.isfinite(int_matched['price'].values) & np.isfinite(pb_matched['price'].values)
+    valued = (np.isfinite(int_matched['market_value'].values)
+              & np.isfinite(pb_matched['market_value'].values))
+    price_int = to_price_units(int_matched['price'].values)
+    price_pb = to_price_units(pb_matched['price'].values)
+    mv_int = to_cents(int_matched['market_value'].values)
+    mv_pb = to_cents(pb_matched['market_value'].values)
+    
+    (qty_var, qty_var_pct, price_var, price_var_pct,
+     mv_var, mv_var_pct) = compare_matched(qty_int, qty_pb, price_int, price_pb, mv_int, mv_pb)
+    
+    # Check quantity
+    mask = np.abs(qty_var_pct) > TOLERANCES['quantity_pct']
+    dollar_impact = np.abs(qty_var * price_int) / PRICE_SCALE
+    break_frames.append(pd.DataFrame({
+        'break_type': BT_QTY,
+        'severity': classify_severity(dollar_impact[mask], qty_var_pct[mask]),
+        'symbol': int_matched['symbol'].values[mask],
+        'account_id': int_matched['account_id'].values[mask],
+        'internal_value': qty_int[mask],
+        'pb_value': qty_pb[mask],
+        'variance': qty_var[mask],
+        'variance_pct': np.round(qty_var_pct[mask], 2),
+        'details': format_details('Quantity', qty_int[mask], qty_pb[mask], '{:,.0f}')
+    }, index=matched_keys[mask]))
+    
+    # Check price
+    mask = priced & (np.abs(price_var_pct) > TOLERANCES['price_pct'])
+    dollar_impact = np.abs(price_var * qty_int) / PRICE_SCALE
+    int_usd, pb_usd = price_int[mask] / PRICE_SCALE, price_pb[mask] / PRICE_SCALE
+    break_frames.append(pd.DataFrame({
+        'break_type': BT_PRICE,
+        'severity': classify_severity(dollar_impact[mask], price_var_pct[mask]),
+        'symbol': int_matched['symbol'].values[mask],
+        'account_id': int_matched['account_id'].values[mask],
+        'internal_value': int_usd,
+        'pb_value': pb_usd,
+        'variance': price_var[mask] / PRICE_SCALE,
+        'variance_pct': np.round(price_var_pct[mask], 2),
+        'details': format_details('Price', int_usd, pb_usd, '${:,.2f}')
+    }, index=matched_keys[mask]))
+    
+    # Check market value
+    mask = (valued & (np.abs(mv_var_pct) > TOLERANCES['market_value_pct'])
+            & (np.abs(mv_var) > TOLERANCES['min_threshold'] * 100))
+    int_usd, pb_usd, var_usd = mv_int[mask] / 100, mv_pb[mask] / 100, mv_var[mask] / 100
+    break_frames.append(pd.DataFrame({
+        'break_type': BT_MV,
+        'severity': classify_severity(var_usd, mv_var_pct[mask]),
+        'symbol': int_matched['symbol'].values[mask],
+        'account_id': int_matched['account_id'].values[mask],
+        'internal_value': int_usd,
+        'pb_value': pb_usd,
+        'variance': var_usd,
+        'variance_pct': np.round(mv_var_pct[mask], 2),
+        'details': format_details('MV', int_usd, pb_usd, '${:,.2f}')
+    }, index=matched_keys[mask]))
+    
+    return pd.concat(break_frames)
+
+
+def reconcile_positions(internal_df: pd.DataFrame, pb_df: pd.DataFrame,
+                        max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Compare positions between Internal System and Prime Broker
+    Returns DataFrame of breaks/exceptions found, one row per break
+    """
     
-    internal_keys = set(internal_df['pos_key'])
-    pb_keys = set(pb_df['pos_key'])
+    print("\n🔍 Running reconciliation...")
     
-    # Check for missing positions
-    missing_in_pb = internal_keys - pb_keys
-    missing_in_internal = pb_keys - internal_keys
-    
-    for key in missing_in_pb:
-        pos = internal_df[internal_df['pos_key'] == key].iloc[0]
-        breaks.append({
-            'break_id': f"BRK-{len(breaks)+1:04d}",
-            'break_type': BreakType.MISSING_IN_TARGET.value,
-            'severity': calculate_severity(pos['market_value'], 100).value,
-            'symbol': pos['symbol'],
-            'account_id': pos['account_id'],
-            'internal_value': pos['market_value'],
-            'pb_value': 0,
-            'variance': pos['market_value'],
-            'variance_pct': 100.0,
-            'details': f"Position exists in Internal but not in Prime Broker"
-        })
-    
-    for key in missing_in_internal:
-        pos = pb_df[pb_df['pos_key'] == key].iloc[0]
-        breaks.append({
-            'break_id': f"BRK-{len(breaks)+1:04d}",
-            'break_type': BreakType.MISSING_IN_SOURCE.value,
-            'severity': calculate_severity(pos['market_value'], 100).value,
-            'symbol': pos['symbol'],
-            'account_id': pos['account_id'],
-            'internal_value': 0,
-            'pb_value': pos['market_value'],
-            'variance': -pos['market_value'],
-            'variance_pct': -100.0,
-            'details': f"Position exists in Prime Broker but not in Internal"
-        })
-    
-    # Compare matching positions
-    common_keys = internal_keys & pb_keys
-    
-    for key in common_keys:
-        int_pos = internal_df[internal_df['pos_key'] == key].iloc[0]
-        pb_pos = pb_df[pb_df['pos_key'] == key].iloc[0]
-        
-        # Check quantity
-        qty_var = int_pos['quantity'] - pb_pos['quantity']
-        if int_pos['quantity'] != 0:
-            qty_var_pct = (qty_var / int_pos['quantity']) * 100
-        else:
-            qty_var_pct = 0
-            
-        if abs(qty_var_pct) > TOLERANCES['quantity_pct']:
-            dollar_impact = abs(qty_var * int_pos['price'])
-            breaks.append({
-                'break_id': f"BRK-{len(breaks)+1:04d}",
-                'break_type': BreakType.QUANTITY_MISMATCH.value,
-                'severity': calculate_severity(dollar_impact, qty_var_pct).value,
-                'symbol': int_pos['symbol'],
-                'account_id': int_pos['account_id'],
-                'internal_value': int_pos['quantity'],
-                'pb_value': pb_pos['quantity'],
-                'variance': qty_var,
-                'variance_pct': round(qty_var_pct, 2),
-                'details': f"Quantity: Internal={int_pos['quantity']:,.0f} vs PB={pb_pos['quantity']:,.0f}"
-            })
-        
-        # Check price
-        price_var = int_pos['price'] - pb_pos['price']
-        if int_pos['price'] != 0:
-            price_var_pct = (price_var / int_pos['price']) * 100
-        else:
-            price_var_pct = 0
-            
-        if abs(price_var_pct) > TOLERANCES['price_pct']:
-            dollar_impact = abs(price_var * int_pos['quantity'])
-            breaks.append({
-                'break_id': f"BRK-{len(breaks)+1:04d}",
-                'break_type': BreakType.PRICE_MISMATCH.value,
-                'severity': calculate_severity(dollar_impact, price_var_pct).value,
-                'symbol': int_pos['symbol'],
-                'account_id': int_pos['account_id'],
-                'internal_value': int_pos['price'],
-                'pb_value': pb_pos['price'],
-                'variance': round(price_var, 2),
-                'variance_pct': round(price_var_pct, 2),
-                'details': f"Price: Internal=${int_pos['price']:,.2f} vs PB=${pb_pos['price']:,.2f}"
-            })
-        
-        # Check market value
-        mv_var = int_pos['market_value'] - pb_pos['market_value']
-        if int_pos['market_value'] != 0:
-            mv_var_pct = (mv_var / int_pos['market_value']) * 100
-        else:
-            mv_var_pct = 0
-            
-        if abs(mv_var_pct) > TOLERANCES['market_value_pct'] and abs(mv_var) > TOLERANCES['min_threshold']:
-            breaks.append({
-                'break_id': f"BRK-{len(breaks)+1:04d}",
-                'break_type': BreakType.MARKET_VALUE_MISMATCH.value,
-                'severity': calculate_severity(mv_var, mv_var_pct).value,
-                'symbol': int_pos['symbol'],
-                'account_id': int_pos['account_id'],
-                'internal_value': int_pos['market_value'],
-                'pb_value': pb_pos['market_value'],
-                'variance': round(mv_var, 2),
-                'variance_pct': round(mv_var_pct, 2),
-                'details': f"MV: Internal=${int_pos['market_value']:,.2f} vs PB=${pb_pos['market_value']:,.2f}"
-            })
+    if len(internal_df) + len(pb_df) >= PARALLEL_MIN_POSITIONS:
+        # Accounts reconcile independently, so large books are split by account
+        # and handed to a process pool. Keys are encoded over the full books so
+        # the merged breaks can be put back in single-pass order
+        internal_keys, pb_keys = encode_position_keys(internal_df, pb_df)
+        int_groups = internal_df.groupby('account_id', observed=True, dropna=False).indices
+        pb_groups = pb_df.groupby('account_id', observed=True, dropna=False).indices
+        accounts = list(dict.fromkeys([*int_groups, *pb_groups]))
+    else:
+        accounts = []
+    
+    if len(accounts) > 1:
+        # Workers are spawned rather than forked: forking a process that has
+        # already started native thread pools can hang it at exit
+        mp_context = multiprocessing.get_context('spawn')
+        empty = np.array([], dtype=np.intp)
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=mp_context) as pool:
+            futures = []
+            for account in accounts:
+                int_rows, pb_rows = int_groups.get(account, empty), pb_groups.get(account, empty)
+                futures.append(pool.submit(reconcile_account,
+                                           internal_df.iloc[int_rows], pb_df.iloc[pb_rows],
+                                           (internal_keys[int_rows], pb_keys[pb_rows])))
+            breaks = pd.concat([f.result() for f in futures])
+        # Same order as a single pass: break type blocks, by position key within each
+        type_rank = pd.Categorical(breaks['break_type'], categories=BREAK_TYPE_ORDER).codes
+        breaks = breaks.iloc[np.lexsort((breaks.index.values, type_rank))]
+    else:
+        breaks = reconcile_account(internal_df, pb_df)
+    breaks = breaks.reset_index(drop=True)
+    
+    breaks['severity'] = breaks['severity'].astype(SEVERITY_DTYPE)
+    breaks['break_type'] = breaks['break_type'].astype(BREAK_TYPE_DTYPE)
+    break_nums = pd.Series(np.arange(1, len(breaks) + 1))
+    breaks.insert(0, 'break_id', ('BRK-' + break_nums.astype(str).str.zfill(4)).values)
     
     print(f"   ✓ Found {len(breaks)} breaks/exceptions")
     
@@ -284,12 +455,12 @@ def reconcile_positions(internal_df: pd.DataFrame, pb_df: pd.DataFrame) -> List[
 # ALERTING SYSTEM
 # =============================================================================
 
-def generate_alerts(breaks: List[Dict]) -> None:
+def generate_alerts(breaks: pd.DataFrame) -> None:
     """Generate alerts for critical and high severity breaks"""
     
-    critical_high = [b for b in breaks if b['severity'] in ['CRITICAL', 'HIGH']]
+    critical_high = breaks[breaks['severity'].isin(['CRITICAL', 'HIGH'])]
     
-    if not critical_high:
+    if critical_high.empty:
         print("\n✅ No critical or high severity breaks - no immediate alerts needed")
         return
     
@@ -304,7 +475,7 @@ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Breaks Requiring Attention: {len(critical_high)}
 
 """
-    for brk in critical_high[:10]:
+    for brk in critical_high.head(10).to_dict('records'):
         slack_message += f"""
 *[{brk['severity']}]* {brk['symbol']} ({brk['account_id']})
 • Type: {brk['break_type']}
@@ -327,10 +498,25 @@ Breaks Requiring Attention: {len(critical_high)}
 # REPORT GENERATOR
 # =============================================================================
 
-def generate_report(breaks: List[Dict], internal_df: pd.DataFrame, pb_df: pd.DataFrame) -> str:
+# Per-break block of the detailed break list, filled from a break record
+BREAK_DETAIL_TEMPLATE = """
+┌─ [{severity:8}] {break_id} ─────────────────────────────────
+│  Symbol:      {symbol}
+│  Account:     {account_id}
+│  Type:        {break_type}
+│  Internal:    {internal_value:>15,.2f}
+│  Prime Broker:{pb_value:>15,.2f}
+│  Variance:    {variance:>+15,.2f} ({variance_pct:+.2f}%)
+│  Details:     {details}
+└──────────────────────────────────────────────────────────────────
+"""
+
+
+def generate_report(breaks: pd.DataFrame, internal_df: pd.DataFrame, pb_df: pd.DataFrame) -> str:
     """Generate comprehensive reconciliation report"""
     
-    report = f"""
+    buf = io.StringIO()
+    buf.write(f"""
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                    POSITION RECONCILIATION REPORT                             ║
 ║                    {datetime.now().strftime('%Y-%m-%d %H:%M:%S'):^40}                    ║
@@ -344,70 +530,75 @@ Total Breaks Identified:      {len(breaks):>10,}
 
 BREAKS BY SEVERITY
 ──────────────────
-"""
+""")
     
-    severity_counts = {}
-    for brk in breaks:
-        sev = brk['severity']
-        severity_counts[sev] = severity_counts.get(sev, 0) + 1
+    severity_counts = breaks['severity'].value_counts()
     
     for sev in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']:
         count = severity_counts.get(sev, 0)
         bar = '█' * min(count * 2, 30)
-        report += f"  {sev:10} : {count:>3} {bar}\n"
+        buf.write(f"  {sev:10} : {count:>3} {bar}\n")
     
-    report += """
+    buf.write("""
 BREAKS BY TYPE
 ──────────────
-"""
+""")
     
-    type_counts = {}
-    for brk in breaks:
-        bt = brk['break_type']
-        type_counts[bt] = type_counts.get(bt, 0) + 1
+    # Most frequent first; ties keep the order the types first appear in
+    type_counts = (breaks.groupby('break_type', observed=True, sort=False).size()
+                   .sort_values(ascending=False, kind='stable'))
     
-    for bt, count in sorted(type_counts.items(), key=lambda x: -x[1]):
-        report += f"  {bt:30} : {count:>3}\n"
+    for bt, count in type_counts.items():
+        buf.write(f"  {bt:30} : {count:>3}\n")
     
-    total_variance = sum(abs(b['variance']) for b in breaks if 'market_value' in b['break_type'].lower() or 'missing' in b['break_type'].lower())
-    report += f"""
+    break_type_lower = breaks['break_type'].astype(str).str.lower()
+    mv_mask = break_type_lower.str.contains('market_value') | break_type_lower.str.contains('missing')
+    total_variance = breaks.loc[mv_mask, 'variance'].abs().sum()
+    buf.write(f"""
 TOTAL MARKET VALUE VARIANCE: ${total_variance:>15,.2f}
 
 DETAILED BREAK LIST
 ───────────────────
-"""
+""")
     
     # Sort by severity and variance
     severity_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-    sorted_breaks = sorted(breaks, key=lambda x: (severity_order.get(x['severity'], 4), -abs(x.get('variance', 0))))
-    
-    for brk in sorted_breaks:
-        report += f"""
-┌─ [{brk['severity']:8}] {brk['break_id']} ─────────────────────────────────
-│  Symbol:      {brk['symbol']}
-│  Account:     {brk['account_id']}
-│  Type:        {brk['break_type']}
-│  Internal:    {brk['internal_value']:>15,.2f}
-│  Prime Broker:{brk['pb_value']:>15,.2f}
-│  Variance:    {brk['variance']:>+15,.2f} ({brk['variance_pct']:+.2f}%)
-│  Details:     {brk['details']}
-└──────────────────────────────────────────────────────────────────
-"""
+    sorted_breaks = breaks.assign(
+        severity_rank=breaks['severity'].astype(str).map(severity_order).fillna(4).astype(np.int8),
+        abs_variance=breaks['variance'].abs()
+    ).sort_values(['severity_rank', 'abs_variance'], ascending=[True, False], kind='mergesort')
+    
+    for brk in sorted_breaks.to_dict('records'):
+        buf.write(BREAK_DETAIL_TEMPLATE.format_map(brk))
     
-    report += """
+    buf.write("""
 ══════════════════════════════════════════════════════════════════════════════
                               END OF REPORT
 ══════════════════════════════════════════════════════════════════════════════
-"""
+""")
     
-    return report
+    return buf.getvalue()
+
+
+def save_breaks(breaks: pd.DataFrame, filename: str = "reconciliation_breaks.parquet") -> None:
+    """
+    Save breaks in a columnar format, chosen by file extension
+    .parquet writes Snappy-compressed Parquet, .arrow/.feather writes Arrow IPC
+    """
+    if not breaks.empty:
+        if filename.endswith(('.arrow', '.feather')):
+            breaks.to_feather(filename)
+        else:
+            breaks.to_parquet(filename, engine='pyarrow', compression='snappy', index=False)
+        print(f"\n💾 Breaks saved to: {filename}")
 
 
-def save_breaks_to_csv(breaks: List[Dict], filename: str = "reconciliation_breaks.csv") -> None:
+def save_breaks_to_csv(breaks: pd.DataFrame, filename: str = "reconciliation_breaks.csv") -> None:
     """Save breaks to CSV file"""
-    if breaks:
-        df = pd.DataFrame(breaks)
-        df.to_csv(filename, index=False)
+    if not breaks.empty:
+        table = pa.Table.from_pandas(breaks, preserve_index=False)
+        pv.write_csv(table, filename,
+                     write_options=pv.WriteOptions(quoting_style='needed', batch_size=65536))
         print(f"\n💾 Breaks saved to: {filename}")
 
 
@@ -452,11 +643,11 @@ def main():
     print(report)
     
     # Save outputs
-    save_breaks_to_csv(breaks)
+    save_breaks(breaks)
     
     # Save report to file
-    with open("reconciliation_report.txt", "w") as f:
-        f.write(report)
+    with open("reconciliation_report.txt", "wb", buffering=1 << 20) as f:
+        f.write(report.encode('utf-8'))
     print(f"📄 Report saved to: reconciliation_report.txt")
     
     # Summary
@@ -464,8 +655,8 @@ def main():
     print("✅ RECONCILIATION COMPLETE")
     print("=" * 70)
     print(f"   Total Breaks Found: {len(breaks)}")
-    print(f"   Critical/High: {len([b for b in breaks if b['severity'] in ['CRITICAL', 'HIGH']])}")
-    print(f"   Files Generated: reconciliation_breaks.csv, reconciliation_report.txt")
+    print(f"   Critical/High: {breaks['severity'].isin(['CRITICAL', 'HIGH']).sum()}")
+    print(f"   Files Generated: reconciliation_breaks.parquet, reconciliation_report.txt")
     print("=" * 70)
 
 